@@ -0,0 +1,99 @@
+"""
+Pool de navegadores para automações com WebBot.
+
+Manter o navegador vivo entre tarefas evita pagar o cold-start do
+WebDriver (2-5s + ~256MB de RAM) a cada execução. O pool guarda uma
+instância de WebBot por combinação (navegador, headless) e a reutiliza
+nas próximas aquisições; todos os navegadores são encerrados apenas na
+saída do processo.
+
+Exemplo de uso:
+    from botcity.web import Browser
+    from browser_pool import acquire
+
+    with acquire(Browser.CHROME, headless=False) as bot:
+        bot.browse("https://www.botcity.dev")
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+
+from botcity.web import WebBot, Browser
+
+# Instâncias vivas, indexadas por (navegador, headless)
+_POOL = {}
+
+# Um lock por chave para que tarefas concorrentes não disparem
+# dois launches do mesmo navegador
+_POOL_LOCK = threading.Lock()
+_LAUNCH_LOCKS = {}
+
+
+def _launch_lock(key):
+    """Retorna (criando se preciso) o lock de launch da chave."""
+    with _POOL_LOCK:
+        lock = _LAUNCH_LOCKS.get(key)
+        if lock is None:
+            lock = _LAUNCH_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def _launch(kind, headless):
+    """Inicia um novo WebBot já com o navegador aberto."""
+    bot = WebBot()
+    bot.headless = headless
+    bot.browser = kind
+    # bot.driver_path = "<path to your WebDriver binary>"
+    bot.start_browser()
+    return bot
+
+
+@contextmanager
+def acquire(kind=Browser.CHROME, headless=False):
+    """
+    Obtém um WebBot pré-aquecido do pool.
+
+    Na primeira aquisição de cada combinação (kind, headless) o
+    navegador é iniciado; nas seguintes a mesma instância é devolvida.
+    Ao sair do contexto o navegador volta para about:blank com os
+    cookies limpos, pronto para a próxima tarefa - ele NÃO é fechado.
+
+    Args:
+        kind: Navegador desejado (enum Browser)
+        headless: Se o navegador roda em modo headless
+    """
+    key = (kind, headless)
+
+    with _launch_lock(key):
+        bot = _POOL.get(key)
+        if bot is None:
+            bot = _launch(kind, headless)
+            _POOL[key] = bot
+
+    try:
+        yield bot
+    finally:
+        # Devolve o navegador limpo em vez de fechá-lo
+        try:
+            bot.navigate_to("about:blank")
+            bot.delete_all_cookies()
+        except Exception:
+            # Navegador morreu; remove do pool para relançar na próxima
+            _POOL.pop(key, None)
+
+
+def _drain_pool():
+    """Encerra todos os navegadores do pool (chamado no atexit)."""
+    with _POOL_LOCK:
+        bots = list(_POOL.values())
+        _POOL.clear()
+
+    for bot in bots:
+        try:
+            bot.stop_browser()
+        except Exception:
+            pass
+
+
+atexit.register(_drain_pool)
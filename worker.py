@@ -68,22 +68,125 @@ Exemplo de uso:
 import os
 import sys
 import json
+import time
+import queue
+import atexit
+import threading
+import functools
 import importlib.util
 import traceback
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 from enum import Enum
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from requests.auth import HTTPBasicAuth
 
+# orjson serializa em C, bem mais rápido que o json da stdlib; se não
+# estiver instalado, cai no encoder padrão
+try:
+    import orjson
 
-class AutomationStatus(Enum):
-    """Status padronizados para automações."""
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+
+# Quantidade máxima de KPIs agrupados em um único POST pelo flusher
+_KPI_BATCH_SIZE = 128
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_UTC = timezone.utc
+
+
+def _utcnow_iso() -> str:
+    """Timestamp UTC em ISO 8601 com precisão de milissegundos."""
+    return datetime.now(_UTC).isoformat(timespec='milliseconds')
+
+# Tempo máximo (segundos) que um log pode esperar no buffer antes do flush
+_LOG_FLUSH_INTERVAL = 2.0
+
+# write() direto evita o overhead de sep/end/flush do print no caminho
+# quente de log
+_stdout_write = sys.stdout.write
+_stderr_write = sys.stderr.write
+
+
+class AutomationStatus(str, Enum):
+    """Status padronizados para automações.
+
+    Herdar de str permite serializar o membro direto no JSON e comparar
+    com literais, sem passar por .value.
+    """
     SUCCESS = "completed"
     PARTIAL_SUCCESS = "partially_completed"
     ERROR = "error"
 
 
+@dataclass(frozen=True)
+class _EnvConfig:
+    """Configuração do ambiente já convertida (ints parseados etc.)."""
+    n8n_webhook_base: Optional[str]
+    worker_id: Optional[str]
+    api_timeout: int
+    bot_version: str
+    api_user: str
+    api_password: str
+    task_id: Optional[int]
+    automation_id: Optional[int]
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_env_config(key):
+    """Converte a tupla de valores de ambiente em um _EnvConfig (cacheado)."""
+    (webhook_base, worker_id, api_timeout, bot_version,
+     api_user, api_password, task_id, automation_id, parameters_str) = key
+
+    try:
+        parameters = json.loads(parameters_str)
+    except json.JSONDecodeError:
+        parameters = {}
+
+    return _EnvConfig(
+        n8n_webhook_base=webhook_base,
+        worker_id=worker_id,
+        api_timeout=int(api_timeout),
+        bot_version=bot_version,
+        api_user=api_user,
+        api_password=api_password,
+        task_id=int(task_id) if task_id else None,
+        automation_id=int(automation_id) if automation_id else None,
+        parameters=parameters
+    )
+
+
+def _load_env_config() -> _EnvConfig:
+    """
+    Lê e converte as variáveis de ambiente uma única vez.
+
+    O parse (ints, JSON de parâmetros) é cacheado pela tupla de valores,
+    então construções repetidas de Worker no mesmo processo reutilizam a
+    configuração já convertida.
+    """
+    return _parse_env_config((
+        os.getenv('N8N_WEBHOOK_URL'),
+        os.getenv('WORKER_ID'),
+        os.getenv('API_TIMEOUT', '30'),
+        os.getenv('BOT_VERSION', 'main'),
+        os.getenv('API_USER', 'worker'),
+        os.getenv('API_PASSWORD', 'ku84T4a7p'),
+        os.getenv('TASK_ID'),
+        os.getenv('AUTOMATION_ID'),
+        os.getenv('TASK_PARAMETERS', '{}')
+    ))
+
+
 class Task:
     """Classe que representa uma tarefa obtida via API N8N."""
     
@@ -101,14 +204,15 @@ class Task:
         self.created_at = task_data.get('created_at')
         self.started_at = task_data.get('started_at')
         self._raw_data = task_data
+        self._parameters_ro = MappingProxyType(self.parameters)
         
     def get_parameter(self, key: str, default=None):
         """Retorna um parâmetro da tarefa."""
         return self.parameters.get(key, default)
     
     def get_all_parameters(self) -> Dict[str, Any]:
-        """Retorna todos os parâmetros da tarefa."""
-        return self.parameters.copy()
+        """Retorna uma visão somente-leitura dos parâmetros da tarefa."""
+        return self._parameters_ro
     
     def to_dict(self) -> Dict[str, Any]:
         """Retorna todos os dados da tarefa."""
@@ -135,150 +239,348 @@ class Worker:
             api_password: Senha para basic auth N8N (opcional, usa env se não fornecido)
         """
         
-        # URLs dos webhooks N8N
-        self.n8n_webhook_base = n8n_webhook_url or os.getenv('N8N_WEBHOOK_URL')
-        
+        # Configuração do ambiente, lida e convertida uma única vez
+        env = _load_env_config()
+
+        # URLs dos webhooks N8N (montadas uma única vez)
+        self.n8n_webhook_base = n8n_webhook_url or env.n8n_webhook_base
+        self._url_logs = f"{self.n8n_webhook_base}/webhook/tarefa/logs"
+        self._url_kpi = f"{self.n8n_webhook_base}/webhook/tarefa/kpi"
+        self._url_status = f"{self.n8n_webhook_base}/webhook/tarefa/status"
+
         # Worker ID
-        self.worker_id = worker_id or os.getenv('WORKER_ID')
-        
+        self.worker_id = worker_id or env.worker_id
+
         # Configurações de timeout e bot version
-        self.api_timeout = api_timeout or int(os.getenv('API_TIMEOUT', '30'))
-        self.bot_version = bot_version or os.getenv('BOT_VERSION', 'main')
-        
+        self.api_timeout = api_timeout or env.api_timeout
+        self.bot_version = bot_version or env.bot_version
+
         # Configurações de Basic Auth para N8N
-        self.api_user = api_user or os.getenv('API_USER', 'worker')
-        self.api_password = api_password or os.getenv('API_PASSWORD', 'ku84T4a7p')
+        self.api_user = api_user or env.api_user
+        self.api_password = api_password or env.api_password
         self.auth = HTTPBasicAuth(self.api_user, self.api_password)
+
+        # Sessão HTTP compartilhada: keep-alive + pool de conexões evita
+        # um handshake TCP/TLS novo a cada webhook
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            # allowed_methods=None: por padrão o urllib3 só re-tenta métodos
+            # idempotentes (GET, HEAD...), mas os webhooks aqui são POST/PATCH
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=None
+            )
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         
         # Task ID e Automation ID (podem não existir no modo desenvolvimento)
-        env_task_id = os.getenv('TASK_ID')
-        env_automation_id = os.getenv('AUTOMATION_ID')
-        
         if task_id is not None:
             self.task_id = int(task_id)
-        elif env_task_id:
-            self.task_id = int(env_task_id)
         else:
-            self.task_id = None  # Pode ser None no modo desenvolvimento
-            
+            self.task_id = env.task_id  # Pode ser None no modo desenvolvimento
+
         if automation_id is not None:
             self.automation_id = int(automation_id)
-        elif env_automation_id:
-            self.automation_id = int(env_automation_id)
         else:
-            self.automation_id = None  # Pode ser None no modo desenvolvimento
-        
-        # Parâmetros da tarefa
+            self.automation_id = env.automation_id  # Pode ser None no modo desenvolvimento
+
+        # Parâmetros da tarefa (cópia para não mutar a config cacheada)
         if parameters is not None:
             self.parameters = parameters
         else:
-            parameters_str = os.getenv('TASK_PARAMETERS', '{}')
-            try:
-                self.parameters = json.loads(parameters_str)
-            except json.JSONDecodeError:
-                self.parameters = {}
+            self.parameters = dict(env.parameters)
+        self._parameters_ro = MappingProxyType(self.parameters)
         
         # Inicializa estado interno
         self._task_started = False
         self._task_finished = False
+
+        # Verbosidade do traceback em error(): 'full' formata a pilha,
+        # qualquer outro valor pula o format_exc
+        self._tb_level = os.getenv('WORKER_TB', 'full')
+
+        # Buffer de logs: acumula entradas e envia em lotes (por tamanho
+        # ou por tempo) em vez de um POST por linha
+        self._log_buffer = []
+        self._log_buffer_max = int(os.getenv('LOG_BATCH_SIZE', '32'))
+        self._log_last_flush = time.monotonic()
+        atexit.register(self._flush_logs)
+
+        # Fila + thread de flush: os KPIs são apenas enfileirados pelo
+        # loop da automação e enviados em lotes em background
+        self._kpi_queue = queue.Queue()
+        self._kpi_flusher = threading.Thread(target=self._drain_kpis, daemon=True)
+        self._kpi_flusher.start()
+
+        # Fila limitada + thread de envio para os demais webhooks (logs):
+        # o tamanho máximo aplica backpressure se o N8N ficar lento
+        self._webhook_q = queue.Queue(maxsize=1024)
+        self._webhook_sender = threading.Thread(target=self._webhook_loop, daemon=True)
+        self._webhook_sender.start()
         
         # NÃO inicia a tarefa automaticamente - isso é responsabilidade do task_processor
         # O status 'running' é gerenciado pelo worker principal
-    
+
+    @property
+    def _webhook_enabled(self) -> bool:
+        """Indica se há para onde enviar webhooks.
+
+        Sem URL base ou task_id (modo desenvolvimento) os métodos de
+        webhook viram no-ops além do print local. É uma propriedade, e
+        não um atributo fixado no __init__, porque get_task_info() pode
+        definir o task_id depois da construção.
+        """
+        return bool(self.n8n_webhook_base) and self.task_id is not None
+
     def log_info(self, message: str, source: str = "stdout"):
         """Registra um log de informação."""
         self._send_log("info", message, source)
-        print(f"[INFO] {message}")
+        _stdout_write(f"[INFO] {message}\n")
     
     def log_warning(self, message: str, source: str = "system"):
         """Registra um log de aviso."""
         self._send_log("warning", message, source)
-        print(f"[WARNING] {message}")
+        _stdout_write(f"[WARNING] {message}\n")
     
     def log_error(self, message: str, source: str = "stderr"):
         """Registra um log de erro."""
         self._send_log("error", message, source)
-        print(f"[ERROR] {message}", file=sys.stderr)
+        _stderr_write(f"[ERROR] {message}\n")
     
     def log_debug(self, message: str, source: str = "system"):
         """Registra um log de debug."""
         self._send_log("debug", message, source)
-        print(f"[DEBUG] {message}")
+        _stdout_write(f"[DEBUG] {message}\n")
     
     def error(self, exception: Exception, context: str = ""):
         """
         Registra uma exceção com contexto.
-        
+
+        O traceback só é formatado quando WORKER_TB='full' (padrão) e
+        segue como campo da mesma entrada de log, em vez de gerar um
+        segundo envio.
+
         Args:
             exception: A exceção que ocorreu
             context: Contexto adicional sobre o erro
         """
         error_msg = f"{context}: {type(exception).__name__}: {str(exception)}" if context else f"{type(exception).__name__}: {str(exception)}"
-        
-        # Log do erro
-        self.log_error(error_msg)
-        
-        # Log do traceback completo
-        tb_str = traceback.format_exc()
-        self.log_error(f"Traceback:\n{tb_str}")
-    
-    def _send_log(self, level: str, message: str, source: str):
-        """Envia log para o N8N (método interno)."""
-        try:
-            log_data = {
-                "task_id": self.task_id,
-                "logs": [{
-                    "level": level,
-                    "message": message,
-                    "source": source,
-                    "timestamp": datetime.utcnow().isoformat()
-                }]
-            }
-            
-            requests.post(
-                f"{self.n8n_webhook_base}/webhook/tarefa/logs",
-                json=log_data,
-                auth=self.auth,
-                timeout=self.api_timeout
-            )
-            
-        except Exception as e:
-            # Se falhar ao enviar log, apenas imprime (não causa loop)
-            print(f"[SYSTEM] Erro ao enviar log: {e}", file=sys.stderr)
-    
+
+        # Formatar o traceback percorre a pilha inteira - só paga o custo
+        # quando a verbosidade pede
+        tb_str = traceback.format_exc() if self._tb_level == 'full' else None
+
+        self._send_log("error", error_msg, "stderr", tb=tb_str)
+        _stderr_write(f"[ERROR] {error_msg}\n")
+        if tb_str:
+            _stderr_write(f"[ERROR] Traceback:\n{tb_str}\n")
+
+    def _send_log(self, level: str, message: str, source: str, tb: Optional[str] = None):
+        """Adiciona log ao buffer e envia em lote quando necessário (método interno)."""
+        entry = {
+            "level": level,
+            "message": message,
+            "source": source,
+            "timestamp": _utcnow_iso()
+        }
+        if tb is not None:
+            entry["traceback"] = tb
+        self._log_buffer.append(entry)
+
+        if (len(self._log_buffer) >= self._log_buffer_max or
+                time.monotonic() - self._log_last_flush > _LOG_FLUSH_INTERVAL):
+            self._flush_logs()
+
+    def _flush_logs(self):
+        """Envia o buffer de logs acumulado para o N8N em um único POST."""
+        buf, self._log_buffer = self._log_buffer, []
+        self._log_last_flush = time.monotonic()
+
+        # Com a thread de envio já encerrada (pós-cleanup) não há consumidor:
+        # descarta em vez de acumular em uma fila morta
+        if not buf or not self._webhook_enabled or not self._webhook_sender.is_alive():
+            return
+
+        # Serializa já na enfileira; a thread de envio só faz o POST dos
+        # bytes prontos. O payload é local porque este método pode rodar
+        # em threads concorrentes (automação, flusher de KPIs, atexit)
+        body = _json_dumps({"task_id": self.task_id, "logs": buf})
+
+        self._webhook_q.put(("POST", self._url_logs, body))
+
+    def _webhook_loop(self):
+        """Loop da thread de envio: consome a fila e entrega os webhooks."""
+        while True:
+            item = self._webhook_q.get()
+
+            # Sentinela de encerramento (enviada pelo cleanup)
+            if item is None:
+                self._webhook_q.task_done()
+                break
+
+            method, url, body = item
+            try:
+                self._session.request(
+                    method,
+                    url,
+                    data=body,
+                    headers=_JSON_HEADERS,
+                    auth=self.auth,
+                    timeout=self.api_timeout
+                )
+            except Exception as e:
+                # Se falhar ao enviar, apenas imprime (não causa loop)
+                print(f"[SYSTEM] Erro ao enviar webhook: {e}", file=sys.stderr)
+            finally:
+                self._webhook_q.task_done()
+
+    def _request_json(self, method: str, url: str, payload):
+        """Envia um payload JSON já serializado (orjson quando disponível)."""
+        return self._session.request(
+            method,
+            url,
+            data=_json_dumps(payload),
+            headers=_JSON_HEADERS,
+            auth=self.auth,
+            timeout=self.api_timeout
+        )
+
     def new_kpi_entry(self, table_name: str, data: Dict[str, Any]):
         """
         Adiciona uma nova entrada de KPI no N8N.
-        
+
+        A entrada é apenas enfileirada; o envio acontece em lotes na
+        thread de flush, sem bloquear o loop da automação.
+
         Args:
             table_name: Nome da "tabela" virtual do KPI
             data: Dicionário com os dados do KPI
         """
+        self._kpi_queue.put({
+            "table_name": table_name,
+            "data": data,
+            "timestamp": _utcnow_iso()
+        })
+
+    def new_kpi_entries(self, table_name: str, entries: list):
+        """
+        Adiciona várias entradas de KPI no N8N em uma única chamada.
+
+        As entradas são enfileiradas com um timestamp comum e enviadas
+        em lotes pela thread de flush.
+
+        Args:
+            table_name: Nome da "tabela" virtual do KPI
+            entries: Lista de dicionários com os dados dos KPIs
+        """
+        if not entries:
+            return
+
+        timestamp = _utcnow_iso()
+        for data in entries:
+            self._kpi_queue.put({
+                "table_name": table_name,
+                "data": data,
+                "timestamp": timestamp
+            })
+
+    def new_kpi_entries_columnar(self, table_name: str, columns: Dict[str, list]):
+        """
+        Adiciona entradas de KPI em formato colunar (uma lista por campo).
+
+        Em vez de N dicionários com as mesmas chaves repetidas, enfileira
+        um único payload com as colunas inteiras - as chaves são
+        serializadas uma vez só e o consumidor no N8N transpõe de volta.
+
+        Args:
+            table_name: Nome da "tabela" virtual do KPI
+            columns: Mapeamento campo -> lista de valores (mesmo tamanho)
+        """
+        if not columns:
+            return
+
+        self._kpi_queue.put({
+            "table_name": table_name,
+            "columns": columns,
+            "timestamp": _utcnow_iso()
+        })
+
+    def _drain_kpis(self):
+        """Loop da thread de flush: agrupa KPIs da fila e envia em lotes."""
+        while True:
+            item = self._kpi_queue.get()
+
+            # Sentinela de encerramento (enviada pelo cleanup)
+            if item is None:
+                self._kpi_queue.task_done()
+                break
+
+            batch = [item]
+            stop = False
+
+            # Aproveita o que mais estiver na fila, até o limite do lote
+            try:
+                while len(batch) < _KPI_BATCH_SIZE:
+                    nxt = self._kpi_queue.get_nowait()
+                    if nxt is None:
+                        stop = True
+                        break
+                    batch.append(nxt)
+            except queue.Empty:
+                pass
+
+            self._post_kpi_batch(batch)
+            for _ in batch:
+                self._kpi_queue.task_done()
+
+            if stop:
+                self._kpi_queue.task_done()  # a sentinela também conta
+                break
+
+    def _post_kpi_batch(self, batch: list):
+        """Envia um lote de KPIs para o N8N (roda na thread de flush)."""
+        if not self._webhook_enabled:
+            return
+
         try:
-            kpi_data = {
-                "task_id": self.task_id,
-                "kpis": [{
-                    "table_name": table_name,
-                    "data": data,
-                    "timestamp": datetime.utcnow().isoformat()
-                }]
-            }
-            
-            response = requests.post(
-                f"{self.n8n_webhook_base}/webhook/tarefa/kpi",
-                json=kpi_data,
+            # Payload montado por lote: task_id pode ser atualizado pela
+            # thread da automação (get_task_info), então nada de template
+            # mutável compartilhado entre threads
+            body = _json_dumps({"task_id": self.task_id, "kpis": batch})
+
+            response = self._session.post(
+                self._url_kpi,
+                data=body,
+                headers=_JSON_HEADERS,
                 auth=self.auth,
                 timeout=self.api_timeout
             )
-            
-            if response.status_code in [200, 201]:
-                self.log_info(f"KPI salvo na tabela '{table_name}': {data}")
-            else:
-                self.log_error(f"Erro ao salvar KPI: {response.status_code}")
-                
+
+            if response.status_code not in [200, 201]:
+                self._report_kpi_failure(f"Erro ao salvar lote de KPIs: {response.status_code}")
+
         except Exception as e:
-            self.log_error(f"Erro ao salvar KPI: {e}")
-    
+            self._report_kpi_failure(f"Erro ao salvar lote de KPIs: {e}")
+
+    def _report_kpi_failure(self, message: str):
+        """Registra falha de entrega de KPI sem bloquear o flusher."""
+        _stderr_write(f"[SYSTEM] {message}\n")
+
+        # A falha pega carona no próximo flush de logs em vez de
+        # disparar um POST próprio
+        self._send_log("error", message, "system")
+
+    def _flush_kpis(self):
+        """Bloqueia até todos os KPIs enfileirados serem enviados."""
+        # Sem a thread de flush viva (pós-cleanup) o join nunca retornaria
+        if self._kpi_flusher.is_alive():
+            self._kpi_queue.join()
+
     def finish_task(self, status: AutomationStatus, message: str,
                    total_items: int, processed_items: int, failed_items: int):
         """
@@ -297,10 +599,9 @@ class Worker:
             if self._task_finished:
                 self.log_warning("finish_task() já foi chamado anteriormente")
                 return
-            
-            self.log_info(f"Finalizando tarefa {self.task_id} com status: {status.value}")
-            
-            # Validação dos parâmetros obrigatórios
+
+            # Validação dos parâmetros obrigatórios - falha antes de
+            # qualquer flush ou montagem de payload
             if not isinstance(status, AutomationStatus):
                 raise ValueError("status deve ser uma instância de AutomationStatus")
             if not message:
@@ -309,12 +610,29 @@ class Worker:
                 raise ValueError("Contadores não podem ser negativos")
             if processed_items + failed_items > total_items:
                 raise ValueError("processed_items + failed_items não pode ser maior que total_items")
-            
+
+            # Modo desenvolvimento: sem webhook não há o que enviar
+            if not self._webhook_enabled:
+                self._task_finished = True
+                self.log_info(f"Tarefa finalizada localmente com status: {status.value} (modo desenvolvimento)")
+                return
+
+            # Garante que KPIs e logs pendentes cheguem antes do status final.
+            # Se o cleanup() já encerrou a thread de envio (dev scripts chamam
+            # cleanup antes do finish_task do finally), o join bloquearia para
+            # sempre em uma fila sem consumidor - nesse caso só pula o dreno
+            self._flush_kpis()
+            if self._webhook_sender.is_alive():
+                self._flush_logs()
+                self._webhook_q.join()
+
+            self.log_info(f"Finalizando tarefa {self.task_id} com status: {status.value}")
+
             update_data = {
                 "task_id": self.task_id,
                 "worker_id": self.worker_id,
-                "status": status.value,
-                "finished_at": datetime.utcnow().isoformat(),
+                "status": status,
+                "finished_at": _utcnow_iso(),
                 "bot_version": self.bot_version,
                 "total_items": total_items,
                 "processed_items": processed_items,
@@ -328,12 +646,7 @@ class Worker:
                 update_data["result_message"] = message
 
             # 1. Tenta enviar para N8N primeiro
-            response = requests.patch(
-                f"{self.n8n_webhook_base}/webhook/tarefa/status",
-                json=update_data,
-                auth=self.auth,
-                timeout=self.api_timeout
-            )
+            response = self._request_json("PATCH", self._url_status, update_data)
             
             if response.status_code in [200, 201]:
                 self._task_finished = True
@@ -357,8 +670,8 @@ class Worker:
         return self.parameters.get(key, default)
     
     def get_all_parameters(self) -> Dict[str, Any]:
-        """Retorna todos os parâmetros da tarefa."""
-        return self.parameters.copy()
+        """Retorna uma visão somente-leitura dos parâmetros da tarefa."""
+        return self._parameters_ro
     
     def get_task_info(self, task_id=None):
         """
@@ -388,13 +701,14 @@ class Worker:
                 'status': 'running' if self._task_started else 'pending',
                 'parameters': self.parameters,
                 'created_at': None,
-                'started_at': datetime.utcnow().isoformat() if self._task_started else None
+                'started_at': _utcnow_iso() if self._task_started else None
             }
             
             # Atualiza o task_id interno se estava None
             if self.task_id is None:
                 self.task_id = task_id
-                
+
+
             return Task(task_data)
             
         except Exception as e:
@@ -407,8 +721,30 @@ class Worker:
             })
     
     def cleanup(self):
-        """Método para limpeza de recursos. Deve ser sobrescrito se necessário."""
-        pass
+        """
+        Libera os recursos do worker: drena as filas, encerra as threads
+        de envio e fecha a sessão HTTP.
+
+        Subclasses que precisarem de limpeza própria devem sobrescrever
+        este método e OBRIGATORIAMENTE chamar super().cleanup(), senão
+        logs/KPIs pendentes são perdidos e a sessão fica aberta.
+        """
+        # Drena e encerra o flusher de KPIs primeiro: falhas de entrega
+        # ainda geram logs, que saem no flush logo abaixo
+        if self._kpi_flusher.is_alive():
+            self._kpi_queue.join()
+            self._kpi_queue.put(None)
+            self._kpi_flusher.join()
+
+        self._flush_logs()
+
+        # Encerra a thread de envio depois de drenar a fila
+        if self._webhook_sender.is_alive():
+            self._webhook_q.join()
+            self._webhook_q.put(None)
+            self._webhook_sender.join()
+
+        self._session.close()
     
     def main(self):
         """
@@ -420,14 +756,65 @@ class Worker:
         raise NotImplementedError("O método main() deve ser implementado pela automação")
 
 
+def report_outcome(client_worker, total_items, processed_items, failed_items):
+    """
+    Decide o status final, loga o resumo e finaliza a tarefa.
+
+    Centraliza o epílogo comum às automações (bot.py e variantes de
+    desenvolvimento): a decisão SUCCESS/PARTIAL_SUCCESS/ERROR, o resumo
+    em um único log (um POST em vez de três) e a chamada de finish_task.
+
+    Args:
+        client_worker: Instância de Worker da automação
+        total_items: Total de itens que deveriam ser processados
+        processed_items: Número de itens processados com sucesso
+        failed_items: Número de itens que falharam
+
+    Returns:
+        tuple: (status, message) usados na finalização
+    """
+    if failed_items == 0:
+        status = AutomationStatus.SUCCESS
+        message = f"Todos os {processed_items} itens processados com sucesso"
+    elif processed_items > 0:
+        status = AutomationStatus.PARTIAL_SUCCESS
+        message = f"{processed_items} itens processados, {failed_items} falharam"
+    else:
+        status = AutomationStatus.ERROR
+        message = f"Todos os {failed_items} itens falharam"
+
+    client_worker.log_info("\n".join([
+        "=== AUTOMAÇÃO FINALIZADA ===",
+        f"Status: {status.value}",
+        f"Processados: {processed_items}",
+        f"Falharam: {failed_items}",
+    ]))
+
+    # Finaliza a tarefa - TODOS OS PARÂMETROS SÃO OBRIGATÓRIOS
+    client_worker.finish_task(
+        status=status,
+        message=message,
+        total_items=total_items,
+        processed_items=processed_items,
+        failed_items=failed_items
+    )
+
+    return status, message
+
+
 # Função utilitária para executar automação
 def run_automation():
     """Função para executar a automação a partir do bot.py."""
     
     # Verifica se todas as variáveis de ambiente necessárias estão definidas
-    required_vars = ['TASK_ID', 'AUTOMATION_ID', 'WORKER_ID']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
+    env = _load_env_config()
+    required_vars = [
+        ('TASK_ID', env.task_id),
+        ('AUTOMATION_ID', env.automation_id),
+        ('WORKER_ID', env.worker_id),
+    ]
+    missing_vars = [name for name, value in required_vars if not value]
+
     if missing_vars:
         print(f"[ERROR] Variáveis de ambiente obrigatórias não definidas: {', '.join(missing_vars)}", file=sys.stderr)
         sys.exit(1)
@@ -445,16 +832,14 @@ def run_automation():
         bot_module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(bot_module)
         
-        # Procura por uma classe que herda de Worker
-        automation_class = None
-        for name in dir(bot_module):
-            obj = getattr(bot_module, name)
-            if (isinstance(obj, type) and 
-                issubclass(obj, Worker) and 
-                obj != Worker):
-                automation_class = obj
-                break
-        
+        # Procura por uma classe que herda de Worker - o registro de
+        # subclasses do próprio Python evita varrer dir() nome a nome.
+        # A última entrada é a mais recente: cada exec_module registra a
+        # classe de novo, e a carga anterior não some do registro
+        subclasses = [cls for cls in Worker.__subclasses__()
+                      if cls.__module__ == bot_module.__name__]
+        automation_class = subclasses[-1] if subclasses else None
+
         if automation_class is None:
             raise ImportError("Nenhuma classe que herda de Worker foi encontrada em bot.py")
         